@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import math
+import time
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 import pygame
 
@@ -15,6 +18,18 @@ TANK_COLOR: Tuple[int, int, int] = (46, 196, 182)
 TANK_SIZE = (64, 48)
 TANK_SPEED = 280  # pixels per second
 TANK_ROTATION_SPEED = 180  # degrees per second
+TARGET_FPS = 60
+# Once vsync is confirmed the display paces frames; this cap only keeps the pacer out of its way.
+VSYNC_FPS_CAP = 240
+VSYNC_PROBE_FRAMES = 5
+# The only event types the game loop reacts to; everything else is kept out of the queue.
+HANDLED_EVENTS = [
+    pygame.QUIT,
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.WINDOWFOCUSLOST,
+    pygame.WINDOWEXPOSED,
+]
 DEFAULT_LISTEN_HOST = "0.0.0.0"
 DEFAULT_SERVER_HOST = "127.0.0.1"
 DEFAULT_PORT = 5000
@@ -28,13 +43,8 @@ PLAYER_COLORS = [
 ]
 
 
-def draw_tank_sprite(
-    surface: pygame.Surface,
-    position: Tuple[float, float],
-    angle: float,
-    color: Tuple[int, int, int],
-    size: Tuple[int, int] = TANK_SIZE,
-) -> None:
+@lru_cache(maxsize=32)
+def _make_tank_base(color: Tuple[int, int, int], size: Tuple[int, int]) -> pygame.Surface:
     barrel_height = 28
     body_width, body_height = size
     tank_surface = pygame.Surface((body_width, body_height + barrel_height), pygame.SRCALPHA)
@@ -45,20 +55,55 @@ def draw_tank_sprite(
     barrel_width = 10
     barrel_rect = pygame.Rect(body_width // 2 - barrel_width // 2, 0, barrel_width, barrel_height)
     pygame.draw.rect(tank_surface, color, barrel_rect, border_radius=4)
+    return tank_surface
+
+
+# Rotated sprites keyed by (color, size, whole degrees); at most 360 per tank look.
+_rotated_cache: Dict[Tuple[Tuple[int, int, int], Tuple[int, int], int], pygame.Surface] = {}
+
 
-    rotated = pygame.transform.rotate(tank_surface, angle)
+def _get_rotated_tank(
+    color: Tuple[int, int, int], size: Tuple[int, int], angle: float
+) -> pygame.Surface:
+    key = (color, size, round(angle) % 360)
+    rotated = _rotated_cache.get(key)
+    if rotated is None:
+        rotated = pygame.transform.rotate(_make_tank_base(color, size), key[2])
+        _rotated_cache[key] = rotated
+    return rotated
+
+
+def tank_sprite(
+    position: Tuple[float, float],
+    angle: float,
+    color: Tuple[int, int, int],
+    size: Tuple[int, int] = TANK_SIZE,
+) -> Tuple[pygame.Surface, pygame.Rect]:
+    """Return the rotated sprite for a tank and the rect it should be blitted into."""
+    body_width, body_height = size
+    rotated = _get_rotated_tank(tuple(color), tuple(size), angle)
     center = (position[0] + body_width / 2, position[1] + body_height / 2)
-    rect = rotated.get_rect(center=center)
-    surface.blit(rotated, rect.topleft)
+    return rotated, rotated.get_rect(center=center)
 
 
-@dataclass
+def draw_tank_sprite(
+    surface: pygame.Surface,
+    position: Tuple[float, float],
+    angle: float,
+    color: Tuple[int, int, int],
+    size: Tuple[int, int] = TANK_SIZE,
+) -> pygame.Rect:
+    rotated, rect = tank_sprite(position, angle, color, size)
+    return surface.blit(rotated, rect)
+
+
+@dataclass(slots=True)
 class ControlInput:
     forward: float = 0.0
     rotation: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Tank:
     position: pygame.Vector2
     angle: float = 0.0
@@ -72,18 +117,17 @@ class Tank:
             self.angle = (self.angle - controls.rotation * self.rotation_speed * dt) % 360
 
         if controls.forward != 0:
-            forward_vector = pygame.Vector2(0, -1).rotate(-self.angle)
-            displacement = forward_vector * controls.forward * self.speed * dt
-            self.position += displacement
-            self._clamp_to_window()
-
-    def _clamp_to_window(self) -> None:
-        width, height = self.size
-        self.position.x = max(0, min(self.position.x, WINDOW_WIDTH - width))
-        self.position.y = max(0, min(self.position.y, WINDOW_HEIGHT - height))
-
-    def draw(self, surface: pygame.Surface) -> None:
-        draw_tank_sprite(
+            # Same as Vector2(0, -1).rotate(-angle), without the temporary vectors.
+            rad = -math.radians(self.angle)
+            step = controls.forward * self.speed * dt
+            width, height = self.size
+            x = self.position.x + math.sin(rad) * step
+            y = self.position.y - math.cos(rad) * step
+            self.position.x = max(0.0, min(x, WINDOW_WIDTH - width))
+            self.position.y = max(0.0, min(y, WINDOW_HEIGHT - height))
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        return draw_tank_sprite(
             surface,
             (self.position.x, self.position.y),
             self.angle,
@@ -92,25 +136,106 @@ class Tank:
         )
 
 
+# One bit per bound key; held keys and taps seen since the last frame are tracked as bitmasks.
+_KEY_BITS = {
+    pygame.K_w: 1 << 0,
+    pygame.K_UP: 1 << 1,
+    pygame.K_s: 1 << 2,
+    pygame.K_DOWN: 1 << 3,
+    pygame.K_a: 1 << 4,
+    pygame.K_LEFT: 1 << 5,
+    pygame.K_d: 1 << 6,
+    pygame.K_RIGHT: 1 << 7,
+}
+_FORWARD_MASK = _KEY_BITS[pygame.K_w] | _KEY_BITS[pygame.K_UP]
+_REVERSE_MASK = _KEY_BITS[pygame.K_s] | _KEY_BITS[pygame.K_DOWN]
+_LEFT_MASK = _KEY_BITS[pygame.K_a] | _KEY_BITS[pygame.K_LEFT]
+_RIGHT_MASK = _KEY_BITS[pygame.K_d] | _KEY_BITS[pygame.K_RIGHT]
+
+_held = 0
+_tapped = 0
+# handle_input refills and returns this one instance every frame.
+_CONTROLS = ControlInput()
+
+
+def track_key_event(event: pygame.event.Event) -> None:
+    global _held, _tapped
+    if event.type == pygame.KEYDOWN:
+        bit = _KEY_BITS.get(event.key, 0)
+        _held |= bit
+        _tapped |= bit
+    elif event.type == pygame.KEYUP:
+        _held &= ~_KEY_BITS.get(event.key, 0)
+    elif event.type == pygame.WINDOWFOCUSLOST:
+        # Key-ups while unfocused never reach us, so don't leave keys stuck down.
+        _held = 0
+
+
 def handle_input() -> ControlInput:
-    keys = pygame.key.get_pressed()
-    controls = ControlInput()
-    if keys[pygame.K_w] or keys[pygame.K_UP]:
-        controls.forward += 1
-    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-        controls.forward -= 1
-    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-        controls.rotation -= 1
-    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-        controls.rotation += 1
+    global _tapped
+    # A key pressed and released within one frame still counts for that frame.
+    active = _held | _tapped
+    _tapped = 0
+    controls = _CONTROLS
+    controls.forward = (active & _FORWARD_MASK != 0) - (active & _REVERSE_MASK != 0)
+    controls.rotation = (active & _RIGHT_MASK != 0) - (active & _LEFT_MASK != 0)
     return controls
 
 
+class FramePacer:
+    """Holds frames to a fixed rate against perf_counter, without SDL's coarse timer."""
+
+    # Sleep in coarse steps until this close to the deadline, then spin the rest.
+    SPIN_WINDOW = 0.002
+
+    def __init__(self, fps: int):
+        self.frame_time = 1 / fps
+        self._last = time.perf_counter()
+        self._next_frame = self._last + self.frame_time
+
+    def tick(self) -> float:
+        """Wait for the next frame boundary and return the seconds since the previous one."""
+        while time.perf_counter() < self._next_frame - self.SPIN_WINDOW:
+            pygame.event.pump()
+            time.sleep(0.001)
+        while time.perf_counter() < self._next_frame:
+            time.sleep(0)
+        now = time.perf_counter()
+        # Schedule from the ideal boundary so rounding doesn't drift, but don't try to
+        # catch up on frames lost to a long stall.
+        self._next_frame += self.frame_time
+        if self._next_frame < now:
+            self._next_frame = now + self.frame_time
+        dt = now - self._last
+        self._last = now
+        return dt
+
+
+def _vsync_in_effect() -> bool:
+    """Time a few presents; with vsync each one blocks until the next vblank.
+
+    Asking for vsync is only a request: SDL quietly falls back to an unsynced renderer
+    when it can't honor it, so measure instead of trusting set_mode.
+    """
+    pygame.display.flip()
+    start = time.perf_counter()
+    for _ in range(VSYNC_PROBE_FRAMES):
+        pygame.display.flip()
+    return (time.perf_counter() - start) / VSYNC_PROBE_FRAMES >= 1 / VSYNC_FPS_CAP
+
+
 def run_game(args: argparse.Namespace) -> None:
     pygame.init()
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    try:
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED, vsync=1)
+        scaled = True
+    except pygame.error:
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        scaled = False
+    pacer = FramePacer(VSYNC_FPS_CAP if scaled and _vsync_in_effect() else TARGET_FPS)
     pygame.display.set_caption("Tank vs. Aliens (Prototype)")
-    clock = pygame.time.Clock()
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(HANDLED_EVENTS)
 
     server_network: ServerNetwork | None = None
     client_network: ClientNetwork | None = None
@@ -142,12 +267,24 @@ def run_game(args: argparse.Namespace) -> None:
         color=local_color,
     )
 
+    # Only the areas drawn last frame and this frame are cleared and pushed to the display.
+    screen.fill(BACKGROUND_COLOR)
+    pygame.display.flip()
+    screen_rect = screen.get_rect()
+    prev_rects: List[pygame.Rect] = []
+    # The HUD is static, so it is only repainted when a tank is cleared or drawn over it.
+    hud_rect: pygame.Rect | None = None
+
     try:
         while True:
-            dt = clock.tick(60) / 1000  # seconds
-            for event in pygame.event.get():
+            dt = pacer.tick()  # seconds
+            for event in pygame.event.get(HANDLED_EVENTS):
                 if event.type == pygame.QUIT:
                     raise SystemExit
+                if event.type == pygame.WINDOWEXPOSED:
+                    # The window contents were lost, so repaint all of it this frame.
+                    prev_rects = [screen_rect]
+                track_key_event(event)
 
             controls = handle_input()
             tank.update(controls, dt)
@@ -166,12 +303,33 @@ def run_game(args: argparse.Namespace) -> None:
             else:
                 remote_tanks = {}
 
-            screen.fill(BACKGROUND_COLOR)
-            tank.draw(screen)
+            sprites = [tank_sprite((tank.position.x, tank.position.y), tank.angle, tank.color)]
             for snapshot in remote_tanks.values():
-                draw_tank_sprite(screen, snapshot.position, snapshot.angle, snapshot.color)
-            draw_hud(screen, args.mode, connection_hint)
-            pygame.display.flip()
+                sprites.append(tank_sprite(snapshot.position, snapshot.angle, snapshot.color))
+            new_rects = [rect for _sprite, rect in sprites]
+            redraw_hud = (
+                hud_rect is None
+                or hud_rect.collidelist(prev_rects) != -1
+                or hud_rect.collidelist(new_rects) != -1
+            )
+
+            for rect in prev_rects:
+                screen.fill(BACKGROUND_COLOR, rect)
+            dirty_rects = prev_rects + new_rects
+            if redraw_hud and hud_rect is not None:
+                # The HUD is drawn with alpha, so clear it rather than stacking it on itself.
+                screen.fill(BACKGROUND_COLOR, hud_rect)
+            screen.blits(sprites, doreturn=False)
+            if redraw_hud:
+                hud_rect = draw_hud(screen, args.mode, connection_hint)
+                dirty_rects.append(hud_rect)
+            if scaled:
+                # The SCALED renderer uploads and presents the whole frame regardless of the
+                # rects passed, so the dirty rects only save drawing work on this path.
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            prev_rects = new_rects
     finally:
         if server_network:
             server_network.shutdown()
@@ -180,8 +338,23 @@ def run_game(args: argparse.Namespace) -> None:
         pygame.quit()
 
 
-def draw_hud(surface: pygame.Surface, mode: str, status_line: str) -> None:
-    font = pygame.font.SysFont("consolas", 20)
+HUD_TEXT_COLOR: Tuple[int, int, int] = (220, 220, 220)
+HUD_PADDING = 10
+HUD_LINE_HEIGHT = 22
+
+_hud_font: pygame.font.Font | None = None
+_hud_cache: Dict[Tuple[str, str], pygame.Surface] = {}
+
+
+def _get_hud_font() -> pygame.font.Font:
+    global _hud_font
+    if _hud_font is None:
+        _hud_font = pygame.font.SysFont("consolas", 20)
+    return _hud_font
+
+
+def _render_hud(mode: str, status_line: str) -> pygame.Surface:
+    font = _get_hud_font()
     instructions = [
         "Controls:",
         "W / Arrow Up    - Move forward",
@@ -191,10 +364,22 @@ def draw_hud(surface: pygame.Surface, mode: str, status_line: str) -> None:
         f"Mode: {mode}",
         status_line,
     ]
-    padding = 10
-    for idx, line in enumerate(instructions):
-        text_surface = font.render(line, True, (220, 220, 220))
-        surface.blit(text_surface, (padding, padding + idx * 22))
+    text_surfaces = [font.render(line, True, HUD_TEXT_COLOR) for line in instructions]
+    width = max(text.get_width() for text in text_surfaces)
+    height = (len(text_surfaces) - 1) * HUD_LINE_HEIGHT + text_surfaces[-1].get_height()
+    hud_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    for idx, text_surface in enumerate(text_surfaces):
+        hud_surface.blit(text_surface, (0, idx * HUD_LINE_HEIGHT))
+    return hud_surface
+
+
+def draw_hud(surface: pygame.Surface, mode: str, status_line: str) -> pygame.Rect:
+    key = (mode, status_line)
+    hud_surface = _hud_cache.get(key)
+    if hud_surface is None:
+        hud_surface = _render_hud(mode, status_line)
+        _hud_cache[key] = hud_surface
+    return surface.blit(hud_surface, (HUD_PADDING, HUD_PADDING))
 
 
 def parse_args() -> argparse.Namespace:
@@ -1,23 +1,127 @@
 from __future__ import annotations
 
-import json
+import selectors
 import socket
+import struct
 import threading
 import time
 import uuid
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import msgpack
+
+# Every message on the wire is a 4-byte big-endian length followed by a msgpack payload.
+_FRAME_HEADER = struct.Struct(">I")
+_HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+# Poses are packed as fixed-point int16 x/y and uint16 angle; state messages carry a run of
+# (player index, pose) records in a single binary blob.
+_POSE = struct.Struct(">hhH")
+_TANK_POSE = struct.Struct(">HhhH")
+_POSITION_SCALE = 16
+_ANGLE_SCALE = 100
+_MAX_FRAME_SIZE = 64 * 1024
+# Consumed bytes are only cut from the front of a receive buffer once they pass this size.
+_COMPACT_THRESHOLD = 64 * 1024
+_SEND_BUFFER_SIZE = 64 * 1024
+# Clients whose unsent backlog grows past this are too slow to keep up and get dropped.
+_MAX_OUTBOX_SIZE = 256 * 1024
+BROADCAST_INTERVAL = 1 / 20
+# Frames produced in the same broadcast tick share one write per client, split only once
+# the batch outgrows a packet.
+BROADCAST_BATCH_SIZE = 1200
+SEND_INTERVAL = 1 / 20
+# Position changes smaller than this (in pixels) aren't worth a packet.
+POSITION_EPSILON = 0.01
+
+
+def _snapshot_changed(
+    previous: Optional[Tuple[Tuple[float, float], float]],
+    position: Tuple[float, float],
+    angle: float,
+) -> bool:
+    if previous is None:
+        return True
+    (prev_x, prev_y), prev_angle = previous
+    return (
+        abs(position[0] - prev_x) > POSITION_EPSILON
+        or abs(position[1] - prev_y) > POSITION_EPSILON
+        or angle != prev_angle
+    )
+
+
+def _frame(data: dict) -> List[bytes]:
+    """Encode ``data`` as a ``[header, payload]`` pair ready for a gathered write."""
+    payload = msgpack.packb(data, use_bin_type=True)
+    return [_FRAME_HEADER.pack(len(payload)), payload]
 
 
 def _encode(data: dict) -> bytes:
-    return (json.dumps(data) + "\n").encode("utf-8")
+    return b"".join(_frame(data))
 
 
-def _decode(line: str) -> dict:
-    return json.loads(line)
+def _send_parts(sock: socket.socket, parts: Sequence[bytes]) -> int:
+    """Write as much of ``parts`` as the socket takes in one call and return the byte count.
 
+    Uses sendmsg to gather the buffers without joining them first, where the platform has it.
+    """
+    if _HAS_SENDMSG:
+        return sock.sendmsg(parts)
+    return sock.send(b"".join(parts))
 
-@dataclass
+
+def _sendall_parts(sock: socket.socket, parts: Sequence[bytes]) -> None:
+    views = [memoryview(part) for part in parts if part]
+    while views:
+        sent = _send_parts(sock, views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if sent:
+            views[0] = views[0][sent:]
+
+
+def _decode(payload: bytes) -> dict:
+    return msgpack.unpackb(payload, raw=False)
+
+
+def _configure_socket(sock: socket.socket) -> None:
+    # Snapshots are small and latency sensitive, so don't let Nagle hold them back.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SEND_BUFFER_SIZE)
+
+
+def _peel_frame(buffer: bytearray, pos: int) -> Tuple[Optional[bytes], int]:
+    """Return the next complete frame payload at ``pos`` and the offset just past it.
+
+    Returns ``(None, pos)`` when the buffer does not yet hold a whole frame.
+    """
+    header_end = pos + _FRAME_HEADER.size
+    if len(buffer) < header_end:
+        return None, pos
+    (length,) = _FRAME_HEADER.unpack_from(buffer, pos)
+    if length > _MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {length} bytes exceeds limit")
+    frame_end = header_end + length
+    if len(buffer) < frame_end:
+        return None, pos
+    with memoryview(buffer) as view:
+        payload = bytes(view[header_end:frame_end])
+    return payload, frame_end
+
+
+def _compact(buffer: bytearray, pos: int) -> int:
+    """Drop consumed bytes from ``buffer`` when worthwhile and return the new read offset."""
+    if pos == len(buffer):
+        buffer.clear()
+        return 0
+    if pos > _COMPACT_THRESHOLD:
+        del buffer[:pos]
+        return 0
+    return pos
+
+
+@dataclass(slots=True)
 class TankSnapshot:
     player_id: str
     position: Tuple[float, float]
@@ -25,11 +129,66 @@ class TankSnapshot:
     color: Tuple[int, int, int]
 
 
-@dataclass
+@dataclass(slots=True)
 class ClientRecord:
     socket: socket.socket
     color: Tuple[int, int, int]
-    buffer: str = ""
+    buffer: bytearray = field(default_factory=bytearray)
+    buffer_pos: int = 0
+    outbox: bytearray = field(default_factory=bytearray)
+
+
+class _StatePublisher:
+    """Publishes remote tank states by swapping in whole dicts, so readers never lock or copy.
+
+    A published dict is never mutated afterwards; the writer always hands over a new one.
+    """
+
+    def __init__(self) -> None:
+        self._states: Dict[str, TankSnapshot] = {}
+        self._filtered: Tuple[Dict[str, TankSnapshot], Optional[str], Dict[str, TankSnapshot]] = (
+            self._states,
+            None,
+            self._states,
+        )
+
+    def publish(self, states: Dict[str, TankSnapshot]) -> None:
+        self._states = states
+
+    @property
+    def current(self) -> Dict[str, TankSnapshot]:
+        return self._states
+
+    def get(self, exclude_id: Optional[str] = None) -> Dict[str, TankSnapshot]:
+        states = self._states
+        source, cached_exclude, filtered = self._filtered
+        if source is states and cached_exclude == exclude_id:
+            return filtered
+        if exclude_id and exclude_id in states:
+            filtered = {pid: snapshot for pid, snapshot in states.items() if pid != exclude_id}
+        else:
+            filtered = states
+        self._filtered = (states, exclude_id, filtered)
+        return filtered
+
+
+def _quantize_pose(position: Tuple[float, float], angle: float) -> Tuple[int, int, int]:
+    """Fixed-point wire form of a pose: 1/16 px int16 positions and 1/100 degree angles."""
+    x = round(position[0] * _POSITION_SCALE)
+    y = round(position[1] * _POSITION_SCALE)
+    return (
+        max(-32768, min(x, 32767)),
+        max(-32768, min(y, 32767)),
+        round(angle % 360 * _ANGLE_SCALE) % (360 * _ANGLE_SCALE),
+    )
+
+
+def _dequantize_pose(x: int, y: int, angle: int) -> Tuple[Tuple[float, float], float]:
+    return (x / _POSITION_SCALE, y / _POSITION_SCALE), angle / _ANGLE_SCALE
+
+
+def _quantize(snapshot: TankSnapshot) -> Tuple[int, int, int]:
+    return _quantize_pose(snapshot.position, snapshot.angle)
 
 
 class ServerNetwork:
@@ -44,10 +203,20 @@ class ServerNetwork:
         self._lock = threading.Lock()
         self._connections: Dict[str, ClientRecord] = {}
         self._remote_states: Dict[str, TankSnapshot] = {}
+        self._remote_states_changed = False
+        self._published_states = _StatePublisher()
         self._local_state: Optional[TankSnapshot] = None
+        # Bumped whenever anything a client would see changes; lets idle ticks skip the broadcast.
+        self._state_version = 0
+        # Set when players join or leave so the next broadcast leads with a fresh roster.
+        self._roster_dirty = False
+        # The following are only touched from the I/O thread.
+        self._player_indices: Dict[str, int] = {}
+        self._last_sent_state: Dict[str, Tuple[int, int, int]] = {}
+        self._pending_broadcast = bytearray()
         self._running = False
-        self._accept_thread: Optional[threading.Thread] = None
-        self._broadcast_thread: Optional[threading.Thread] = None
+        self._io_thread: Optional[threading.Thread] = None
+        self._selector: Optional[selectors.BaseSelector] = None
         self._socket: Optional[socket.socket] = None
 
     def start(self) -> None:
@@ -58,25 +227,17 @@ class ServerNetwork:
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self._socket.bind((self.host, self.port))
         self._socket.listen(5)
-        self._accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
-        self._accept_thread.start()
-        self._broadcast_thread = threading.Thread(target=self._broadcast_loop, daemon=True)
-        self._broadcast_thread.start()
+        self._socket.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        self._io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self._io_thread.start()
 
     def shutdown(self) -> None:
         self._running = False
-        if self._socket:
-            try:
-                self._socket.close()
-            except OSError:
-                pass
-        with self._lock:
-            for record in list(self._connections.values()):
-                try:
-                    record.socket.close()
-                except OSError:
-                    pass
-            self._connections.clear()
+        if self._io_thread:
+            self._io_thread.join(timeout=1.0)
+            self._io_thread = None
 
     def update_local_state(
         self,
@@ -85,88 +246,176 @@ class ServerNetwork:
         angle: float,
         color: Tuple[int, int, int],
     ) -> None:
+        previous = self._local_state
+        if (
+            previous is not None
+            and previous.player_id == player_id
+            and previous.color == color
+            and not _snapshot_changed((previous.position, previous.angle), position, angle)
+        ):
+            return
         snapshot = TankSnapshot(player_id=player_id, position=position, angle=angle, color=color)
         with self._lock:
+            if previous is None or previous.player_id != player_id or previous.color != color:
+                self._roster_dirty = True
             self._local_state = snapshot
+            self._state_version += 1
 
     def get_remote_states(self, exclude_id: Optional[str] = None) -> Dict[str, TankSnapshot]:
-        with self._lock:
-            states = dict(self._remote_states)
-        if exclude_id and exclude_id in states:
-            states.pop(exclude_id, None)
-        return states
+        """Return the latest published remote states; treat the result as read-only."""
+        return self._published_states.get(exclude_id)
 
     def _next_color(self) -> Tuple[int, int, int]:
-        color = self._palette_cache[self._color_index % len(self._palette_cache)]
-        self._color_index += 1
+        color = self._palette_cache[self._color_index]
+        self._color_index = (self._color_index + 1) % len(self._palette_cache)
         return color
 
-    def _accept_loop(self) -> None:
-        assert self._socket is not None
-        while self._running:
-            try:
-                client_sock, _addr = self._socket.accept()
-            except OSError:
-                if not self._running:
-                    break
-                continue
-            client_sock.setblocking(True)
-            player_id = uuid.uuid4().hex[:8]
-            color = self._next_color()
-            record = ClientRecord(socket=client_sock, color=color, buffer="")
-            with self._lock:
-                self._connections[player_id] = record
-                self._remote_states[player_id] = TankSnapshot(
-                    player_id=player_id,
-                    position=(0.0, 0.0),
-                    angle=0.0,
-                    color=color,
-                )
-            assign_msg = {"type": "assign", "player_id": player_id, "color": color}
-            try:
-                client_sock.sendall(_encode(assign_msg))
-            except OSError:
-                self._remove_client(player_id)
-                continue
-            threading.Thread(
-                target=self._client_loop, args=(player_id,), daemon=True
-            ).start()
+    def _io_loop(self) -> None:
+        assert self._selector is not None
+        next_broadcast = time.monotonic()
+        broadcast_version = -1
+        try:
+            while self._running:
+                timeout = max(0.0, next_broadcast - time.monotonic())
+                for key, mask in self._selector.select(timeout):
+                    if key.data is None:
+                        self._accept_client()
+                        continue
+                    if mask & selectors.EVENT_READ:
+                        self._read_client(key.data)
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush_client(key.data)
+                if self._remote_states_changed:
+                    self._publish_remote_states()
+                now = time.monotonic()
+                if now >= next_broadcast:
+                    next_broadcast = now + BROADCAST_INTERVAL
+                    version = self._state_version
+                    if version != broadcast_version:
+                        self._broadcast()
+                        broadcast_version = version
+        finally:
+            self._close_all()
 
-    def _client_loop(self, player_id: str) -> None:
+    def _accept_client(self) -> None:
+        assert self._socket is not None and self._selector is not None
+        try:
+            client_sock, _addr = self._socket.accept()
+        except OSError:
+            # Nothing to accept after all, or this one connection failed (EMFILE,
+            # ECONNABORTED, ...); either way the loop keeps serving everyone else.
+            return
+        try:
+            client_sock.setblocking(False)
+            _configure_socket(client_sock)
+        except OSError:
+            client_sock.close()
+            return
+        player_id = uuid.uuid4().hex[:8]
+        color = self._next_color()
+        record = ClientRecord(socket=client_sock, color=color)
+        with self._lock:
+            self._connections[player_id] = record
+            self._remote_states[player_id] = TankSnapshot(
+                player_id=player_id,
+                position=(0.0, 0.0),
+                angle=0.0,
+                color=color,
+            )
+            self._remote_states_changed = True
+            self._state_version += 1
+            self._roster_dirty = True
+        self._selector.register(client_sock, selectors.EVENT_READ, player_id)
+        assign_msg = {"type": "assign", "player_id": player_id, "color": color}
+        # Bring the newcomer up to what everyone else has already been sent;
+        # from here on it only needs the same deltas as the rest.
+        welcome = [
+            *_frame(assign_msg),
+            *_frame(self._build_roster_message()),
+            *_frame(self._build_full_state_message()),
+        ]
+        self._send_to_client(player_id, record, welcome)
+
+    def _read_client(self, player_id: str) -> None:
         client = self._connections.get(player_id)
         if not client:
             return
-        sock = client.socket
         buffer = client.buffer
         try:
-            while self._running:
-                data = sock.recv(4096)
-                if not data:
+            data = client.socket.recv(4096)
+            if not data:
+                self._remove_client(player_id)
+                return
+            buffer.extend(data)
+            pos = client.buffer_pos
+            while True:
+                payload, pos = _peel_frame(buffer, pos)
+                if payload is None:
                     break
-                buffer += data.decode("utf-8")
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    if not line.strip():
-                        continue
-                    self._handle_message(player_id, line)
-        except OSError:
+                self._handle_message(player_id, payload)
+            client.buffer_pos = _compact(buffer, pos)
+        except (BlockingIOError, InterruptedError):
             pass
-        finally:
+        except (OSError, ValueError):
             self._remove_client(player_id)
 
-    def _handle_message(self, player_id: str, line: str) -> None:
+    def _send_to_client(
+        self, player_id: str, record: ClientRecord, parts: Sequence[bytes]
+    ) -> None:
+        """Write ``parts`` now if possible and queue whatever the socket won't take."""
+        if record.outbox:
+            for part in parts:
+                record.outbox.extend(part)
+        else:
+            try:
+                sent = _send_parts(record.socket, parts)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._remove_client(player_id)
+                return
+            for part in parts:
+                if sent >= len(part):
+                    sent -= len(part)
+                    continue
+                record.outbox.extend(memoryview(part)[sent:])
+                sent = 0
+            if not record.outbox:
+                return
+            assert self._selector is not None
+            self._selector.modify(
+                record.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, player_id
+            )
+        if len(record.outbox) > _MAX_OUTBOX_SIZE:
+            self._remove_client(player_id)
+
+    def _flush_client(self, player_id: str) -> None:
+        record = self._connections.get(player_id)
+        if not record:
+            return
         try:
-            payload = _decode(line)
-        except json.JSONDecodeError:
+            sent = record.socket.send(record.outbox)
+        except (BlockingIOError, InterruptedError):
             return
-        if payload.get("type") != "update":
+        except OSError:
+            self._remove_client(player_id)
+            return
+        del record.outbox[:sent]
+        if not record.outbox:
+            assert self._selector is not None
+            self._selector.modify(record.socket, selectors.EVENT_READ, player_id)
+
+    def _handle_message(self, player_id: str, frame: bytes) -> None:
+        try:
+            payload = _decode(frame)
+        except ValueError:
             return
-        position = payload.get("position")
-        angle = payload.get("angle")
-        if not isinstance(position, list) or len(position) != 2:
+        if not isinstance(payload, dict) or payload.get("type") != "update":
             return
-        if not isinstance(angle, (int, float)):
+        pose = payload.get("pose")
+        if not isinstance(pose, bytes) or len(pose) != _POSE.size:
             return
+        position, angle = _dequantize_pose(*_POSE.unpack(pose))
         with self._lock:
             snapshot = self._remote_states.get(player_id)
             if not snapshot:
@@ -175,74 +424,144 @@ class ServerNetwork:
                 color = snapshot.color
             self._remote_states[player_id] = TankSnapshot(
                 player_id=player_id,
-                position=(float(position[0]), float(position[1])),
-                angle=float(angle),
+                position=position,
+                angle=angle,
                 color=color,
             )
+            self._remote_states_changed = True
+            self._state_version += 1
 
-    def _broadcast_loop(self) -> None:
-        while self._running:
-            message = self._build_state_message()
-            if message:
-                encoded = _encode(message)
-                with self._lock:
-                    dead_clients: List[str] = []
-                    for player_id, record in self._connections.items():
-                        try:
-                            record.socket.sendall(encoded)
-                        except OSError:
-                            dead_clients.append(player_id)
-                    for player_id in dead_clients:
-                        self._remove_client(player_id)
-            time.sleep(1 / 20)
+    def _broadcast(self) -> None:
+        with self._lock:
+            roster_dirty = self._roster_dirty
+            self._roster_dirty = False
+        if roster_dirty:
+            self._queue_broadcast(self._build_roster_message())
+        message = self._build_state_message()
+        if message:
+            self._queue_broadcast(message)
+        self._flush_broadcast()
+
+    def _queue_broadcast(self, message: dict) -> None:
+        self._pending_broadcast += _encode(message)
+        if len(self._pending_broadcast) >= BROADCAST_BATCH_SIZE:
+            self._flush_broadcast()
+
+    def _flush_broadcast(self) -> None:
+        if not self._pending_broadcast:
+            return
+        encoded = bytes(self._pending_broadcast)
+        self._pending_broadcast.clear()
+        for player_id, record in list(self._connections.items()):
+            self._send_to_client(player_id, record, [encoded])
 
-    def _build_state_message(self) -> Optional[dict]:
+    def _current_states(self) -> List[TankSnapshot]:
         with self._lock:
             states = list(self._remote_states.values())
             if self._local_state:
                 states.append(self._local_state)
-        if not states:
+        return states
+
+    def _player_index(self, player_id: str) -> int:
+        index = self._player_indices.get(player_id)
+        if index is None:
+            # Reuse the lowest free slot so indices stay small on the wire.
+            used = set(self._player_indices.values())
+            index = next(i for i in range(len(used) + 1) if i not in used)
+            self._player_indices[player_id] = index
+        return index
+
+    def _build_roster_message(self) -> dict:
+        players = [
+            [self._player_index(snapshot.player_id), snapshot.player_id, list(snapshot.color)]
+            for snapshot in self._current_states()
+        ]
+        return {"type": "roster", "players": players}
+
+    def _build_state_message(self) -> Optional[dict]:
+        """Pack the tanks whose quantized pose differs from what was last broadcast."""
+        tanks_payload = bytearray()
+        for snapshot in self._current_states():
+            pose = _quantize(snapshot)
+            if self._last_sent_state.get(snapshot.player_id) == pose:
+                continue
+            self._last_sent_state[snapshot.player_id] = pose
+            tanks_payload += _TANK_POSE.pack(self._player_index(snapshot.player_id), *pose)
+        if not tanks_payload:
             return None
-        tanks_payload = []
-        for snapshot in states:
-            tanks_payload.append(
-                {
-                    "player_id": snapshot.player_id,
-                    "position": [snapshot.position[0], snapshot.position[1]],
-                    "angle": snapshot.angle,
-                    "color": list(snapshot.color),
-                }
-            )
+        return {"type": "state", "tanks": bytes(tanks_payload)}
+
+    def _build_full_state_message(self) -> dict:
+        tanks_payload = b"".join(
+            _TANK_POSE.pack(self._player_index(player_id), *pose)
+            for player_id, pose in self._last_sent_state.items()
+        )
         return {"type": "state", "tanks": tanks_payload}
 
     def _remove_client(self, player_id: str) -> None:
         with self._lock:
             record = self._connections.pop(player_id, None)
-            self._remote_states.pop(player_id, None)
+            if self._remote_states.pop(player_id, None):
+                self._remote_states_changed = True
+            self._state_version += 1
+            self._roster_dirty = True
+        self._player_indices.pop(player_id, None)
+        self._last_sent_state.pop(player_id, None)
         if record:
+            if self._selector:
+                try:
+                    self._selector.unregister(record.socket)
+                except (KeyError, ValueError):
+                    pass
             try:
                 record.socket.close()
             except OSError:
                 pass
 
+    def _publish_remote_states(self) -> None:
+        with self._lock:
+            states = dict(self._remote_states)
+            self._remote_states_changed = False
+        self._published_states.publish(states)
+
+    def _close_all(self) -> None:
+        for player_id in list(self._connections):
+            self._remove_client(player_id)
+        self._publish_remote_states()
+        if self._selector:
+            self._selector.close()
+            self._selector = None
+        if self._socket:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
 
 class ClientNetwork:
-    def __init__(self, server_host: str, server_port: int):
+    def __init__(self, server_host: str, server_port: int, send_interval_s: float = SEND_INTERVAL):
         self.server_host = server_host
         self.server_port = server_port
+        self.send_interval_s = send_interval_s
         self.socket: Optional[socket.socket] = None
         self.player_id: Optional[str] = None
         self.assigned_color: Optional[Tuple[int, int, int]] = None
-        self._remote_states: Dict[str, TankSnapshot] = {}
-        self._lock = threading.Lock()
-        self._buffer = ""
+        self._published_states = _StatePublisher()
+        # Maps the server's small per-player wire index to (player_id, color).
+        self._roster: Dict[int, Tuple[str, Tuple[int, int, int]]] = {}
+        self._buffer = bytearray()
+        self._buffer_pos = 0
         self._running = False
         self._receiver_thread: Optional[threading.Thread] = None
+        self._last_send = float("-inf")
+        self._last_sent: Optional[Tuple[Tuple[float, float], float]] = None
 
     def connect(self, timeout: float = 5.0) -> None:
         if self.socket:
             return
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        _configure_socket(sock)
         sock.settimeout(timeout)
         sock.connect((self.server_host, self.server_port))
         self.socket = sock
@@ -268,43 +587,75 @@ class ClientNetwork:
     def send_snapshot(self, position: Tuple[float, float], angle: float) -> None:
         if not self.socket or not self._running:
             return
-        payload = {"type": "update", "position": [position[0], position[1]], "angle": angle}
+        now = time.monotonic()
+        if now - self._last_send < self.send_interval_s:
+            return
+        if not _snapshot_changed(self._last_sent, position, angle):
+            return
+        payload = {"type": "update", "pose": _POSE.pack(*_quantize_pose(position, angle))}
         try:
-            self.socket.sendall(_encode(payload))
+            _sendall_parts(self.socket, _frame(payload))
         except OSError:
             self.close()
+            return
+        self._last_send = now
+        self._last_sent = (position, angle)
 
     def get_remote_states(self, exclude_id: Optional[str] = None) -> Dict[str, TankSnapshot]:
-        with self._lock:
-            states = dict(self._remote_states)
-        if exclude_id and exclude_id in states:
-            states.pop(exclude_id, None)
-        return states
+        """Return the latest published remote states; treat the result as read-only."""
+        return self._published_states.get(exclude_id)
 
     def _receiver_loop(self) -> None:
         while self._running and self.socket:
             payload = self._read_message_blocking(non_blocking=True)
             if payload is None:
                 continue
-            if payload.get("type") != "state":
+            message_type = payload.get("type")
+            if message_type == "roster":
+                self._apply_roster(payload.get("players", []))
+            elif message_type == "state":
+                self._apply_state(payload.get("tanks", b""))
+
+    def _apply_roster(self, players: list) -> None:
+        roster: Dict[int, Tuple[str, Tuple[int, int, int]]] = {}
+        for entry in players:
+            if not isinstance(entry, list) or len(entry) != 3:
                 continue
-            tanks = payload.get("tanks", [])
-            with self._lock:
-                updated: Dict[str, TankSnapshot] = {}
-                for tank in tanks:
-                    player_id = tank.get("player_id")
-                    position = tank.get("position") or [0, 0]
-                    angle = tank.get("angle", 0.0)
-                    color = tank.get("color") or [46, 196, 182]
-                    if not player_id:
-                        continue
-                    updated[player_id] = TankSnapshot(
-                        player_id=player_id,
-                        position=(float(position[0]), float(position[1])),
-                        angle=float(angle),
-                        color=(int(color[0]), int(color[1]), int(color[2])),
-                    )
-                self._remote_states = updated
+            index, player_id, color = entry
+            roster[int(index)] = (player_id, (int(color[0]), int(color[1]), int(color[2])))
+        self._roster = roster
+        colors = dict(roster.values())
+        self._published_states.publish(
+            {
+                player_id: TankSnapshot(
+                    player_id=player_id,
+                    position=snapshot.position,
+                    angle=snapshot.angle,
+                    color=colors[player_id],
+                )
+                for player_id, snapshot in self._published_states.current.items()
+                if player_id in colors
+            }
+        )
+
+    def _apply_state(self, tanks: bytes) -> None:
+        if not isinstance(tanks, bytes) or len(tanks) % _TANK_POSE.size:
+            return
+        updated: Dict[str, TankSnapshot] = {}
+        for index, x, y, angle in _TANK_POSE.iter_unpack(tanks):
+            player = self._roster.get(index)
+            if not player:
+                continue
+            player_id, color = player
+            position, heading = _dequantize_pose(x, y, angle)
+            updated[player_id] = TankSnapshot(
+                player_id=player_id,
+                position=position,
+                angle=heading,
+                color=color,
+            )
+        if updated:
+            self._published_states.publish({**self._published_states.current, **updated})
 
     def _read_message_blocking(self, non_blocking: bool = False) -> Optional[dict]:
         if not self.socket:
@@ -313,18 +664,20 @@ class ClientNetwork:
         sock.settimeout(0.1 if non_blocking else None)
         try:
             while True:
-                if "\n" in self._buffer:
-                    line, self._buffer = self._buffer.split("\n", 1)
-                    if line.strip():
-                        return _decode(line)
+                payload, self._buffer_pos = _peel_frame(self._buffer, self._buffer_pos)
+                if payload is not None:
+                    message = _decode(payload)
+                    if isinstance(message, dict):
+                        return message
+                    continue
+                self._buffer_pos = _compact(self._buffer, self._buffer_pos)
                 data = sock.recv(4096)
                 if not data:
                     self.close()
                     return None
-                self._buffer += data.decode("utf-8")
+                self._buffer.extend(data)
         except socket.timeout:
             return None
-        except OSError:
+        except (OSError, ValueError):
             self.close()
             return None
-